@@ -918,6 +918,12 @@ def _is_zero_valued(values):
         return numpy.count_nonzero(values) == 0
 
 
+# Small integer literals occur constantly as loop bounds, indices and
+# switch cases; share instances in the spirit of CPython's small-int
+# cache. LiteralInt is an immutable value type, so sharing is safe.
+_small_literal_ints = [LiteralInt(i) for i in range(257)]
+
+
 def as_cexpr(node):
     """Typechecks and wraps an object as a valid CExpr.
 
@@ -930,6 +936,8 @@ def as_cexpr(node):
     elif isinstance(node, bool):
         return LiteralBool(node)
     elif isinstance(node, numbers.Integral):
+        if 0 <= node < 257:
+            return _small_literal_ints[node]
         return LiteralInt(node)
     elif isinstance(node, numbers.Real):
         return LiteralFloat(node)
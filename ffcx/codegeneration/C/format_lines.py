@@ -39,20 +39,30 @@ def iter_indented_lines(snippets, level=0):
     - tuple,list: Yield lines from recursive application of this function to list items.
 
     """
+    # Iterate with an explicit stack instead of recursive generators,
+    # so each line is yielded once rather than bubbling through one
+    # generator frame per nesting level; most snippets are single
+    # lines, which skip the split entirely
     tabsize = 2
-    indentation = ' ' * (tabsize * level)
-    if isinstance(snippets, str):
-        for line in snippets.split("\n"):
-            yield indentation + line
-    elif isinstance(snippets, Indented):
-        for line in iter_indented_lines(snippets.body, level + 1):
-            yield line
-    elif isinstance(snippets, (tuple, list)):
-        for part in snippets:
-            for line in iter_indented_lines(part, level):
-                yield line
-    else:
-        raise RuntimeError("Unexpected type %s:\n%s" % (type(snippets), str(snippets)))
+    indentations = {}
+    stack = [(snippets, level)]
+    while stack:
+        part, lvl = stack.pop()
+        if isinstance(part, str):
+            indentation = indentations.get(lvl)
+            if indentation is None:
+                indentation = indentations[lvl] = ' ' * (tabsize * lvl)
+            if "\n" in part:
+                for line in part.split("\n"):
+                    yield indentation + line
+            else:
+                yield indentation + part
+        elif isinstance(part, Indented):
+            stack.append((part.body, lvl + 1))
+        elif isinstance(part, (tuple, list)):
+            stack.extend((p, lvl) for p in reversed(part))
+        else:
+            raise RuntimeError("Unexpected type %s:\n%s" % (type(part), str(part)))
 
 
 def format_indented_lines(snippets, level=0):
@@ -14,8 +14,6 @@ _subs = (
 
 def format_float(x, precision=None):
     """Format a float value according to given precision."""
-    global _subs
-
     if precision:
         if isinstance(x, complex):
             s = "({:.{prec}}+I*{:.{prec}})".format(x.real, x.imag, prec=precision)
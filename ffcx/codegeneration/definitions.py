@@ -51,10 +51,12 @@ class FFCXBackendDefinitions(object):
         handler = self.call_lookup.get(ttype, False)
 
         if not handler:
-            # Look for parent class types instead
+            # Look for parent class types instead, caching the resolved
+            # handler so later calls with this type hit the dict lookup
             for k in self.call_lookup.keys():
                 if isinstance(t, k):
                     handler = self.call_lookup[k]
+                    self.call_lookup[ttype] = handler
                     break
 
         if handler:
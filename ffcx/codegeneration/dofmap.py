@@ -9,11 +9,18 @@
 
 import logging
 import typing
+from string import Formatter
 
 import ffcx.codegeneration.dofmap_template as ufcx_dofmap
 
 logger = logging.getLogger("ffcx")
 
+# Template field names, extracted once at import so each generated
+# dofmap only validates its keys against a precomputed set.
+# Square brackets are removed from any field names.
+_factory_fields = {fname.split("[")[0] for _, fname, _, _
+                   in Formatter().parse(ufcx_dofmap.factory) if fname}
+
 
 def tabulate_entity_dofs(L, entity_dofs: typing.List[typing.List[typing.List[int]]],
                          num_dofs_per_entity: typing.List[int]):
@@ -99,11 +106,7 @@ def generator(ir, options):
         d["sub_dofmaps"] = "NULL"
 
     # Check that no keys are redundant or have been missed
-    from string import Formatter
-    fields = [fname for _, fname, _, _ in Formatter().parse(ufcx_dofmap.factory) if fname]
-    # Remove square brackets from any field names
-    fields = [f.split("[")[0] for f in fields]
-    assert set(fields) == set(
+    assert _factory_fields == set(
         d.keys()), "Mismatch between keys in template and in formatting dict."
 
     # Format implementation code
@@ -7,6 +7,7 @@
 import collections
 import logging
 from itertools import product
+from string import Formatter
 from typing import Any, DefaultDict, Dict, Set
 
 import ufl
@@ -19,6 +20,11 @@ from ffcx.naming import cdtype_to_numpy, scalar_to_value_type
 
 logger = logging.getLogger("ffcx")
 
+# Template field names, extracted once at import so each generated
+# expression only validates its keys against a precomputed set
+_factory_fields = {fname for _, fname, _, _
+                   in Formatter().parse(expressions_template.factory) if fname}
+
 
 def generator(ir, options):
     """Generate UFC code for an expression."""
@@ -122,9 +128,7 @@ def generator(ir, options):
         d["function_spaces_init"] = ""
 
     # Check that no keys are redundant or have been missed
-    from string import Formatter
-    fields = [fname for _, fname, _, _ in Formatter().parse(expressions_template.factory) if fname]
-    assert set(fields) == set(d.keys()), "Mismatch between keys in template and in formatting dict"
+    assert _factory_fields == set(d.keys()), "Mismatch between keys in template and in formatting dict"
 
     # Format implementation code
     implementation = expressions_template.factory.format_map(d)
@@ -9,6 +9,7 @@
 # have been made to the generated code.
 
 import logging
+from string import Formatter
 
 import ffcx.codegeneration.basix_custom_element_template as ufcx_basix_custom_finite_element
 import ffcx.codegeneration.finite_element_template as ufcx_finite_element
@@ -17,6 +18,13 @@ import ufl
 logger = logging.getLogger("ffcx")
 index_type = "int"
 
+# Template field names, extracted once at import so each generated
+# element only validates its keys against a precomputed set
+_factory_fields = {fname for _, fname, _, _
+                   in Formatter().parse(ufcx_finite_element.factory) if fname}
+_custom_factory_fields = {fname for _, fname, _, _
+                          in Formatter().parse(ufcx_basix_custom_finite_element.factory) if fname}
+
 
 def generator(ir, options):
     """Generate UFC code for a finite element."""
@@ -99,11 +107,7 @@ def generator(ir, options):
         d["custom_element_init"] = ""
 
     # Check that no keys are redundant or have been missed
-    from string import Formatter
-    fieldnames = [
-        fname for _, fname, _, _ in Formatter().parse(ufcx_finite_element.factory) if fname
-    ]
-    assert set(fieldnames) == set(
+    assert _factory_fields == set(
         d.keys()), "Mismatch between keys in template and in formatting dict"
 
     # Format implementation code
@@ -141,16 +145,14 @@ def generate_custom_element(name, ir):
     d["wcoeffs_cols"] = ir.wcoeffs.shape[1]
     d["wcoeffs"] = f"wcoeffs_{name}"
     d["wcoeffs_init"] = f"double wcoeffs_{name}[{ir.wcoeffs.shape[0] * ir.wcoeffs.shape[1]}] = "
-    d["wcoeffs_init"] += "{" + ",".join([f" {i}" for row in ir.wcoeffs for i in row]) + "};"
+    d["wcoeffs_init"] += "{" + ",".join([f" {i}" for i in ir.wcoeffs.flat]) + "};"
 
     npts = []
     x = []
     for entity in ir.x:
         for points in entity:
             npts.append(points.shape[0])
-            for row in points:
-                for i in row:
-                    x.append(i)
+            x.extend(points.flat)
     d["npts"] = f"npts_{name}"
     d["npts_init"] = f"int npts_{name}[{len(npts)}] = "
     d["npts_init"] += "{" + ",".join([f" {i}" for i in npts]) + "};"
@@ -162,11 +164,7 @@ def generate_custom_element(name, ir):
     for entity in ir.M:
         for mat4d in entity:
             ndofs.append(mat4d.shape[0])
-            for mat3d in mat4d:
-                for mat2d in mat3d:
-                    for row in mat2d:
-                        for i in row:
-                            M.append(i)
+            M.extend(mat4d.flat)
 
     d["ndofs"] = f"ndofs_{name}"
     d["ndofs_init"] = f"int ndofs_{name}[{len(ndofs)}] = "
@@ -176,11 +174,7 @@ def generate_custom_element(name, ir):
     d["M_init"] += "{" + ",".join([f" {i}" for i in M]) + "};"
 
     # Check that no keys are redundant or have been missed
-    from string import Formatter
-    fieldnames = [
-        fname for _, fname, _, _ in Formatter().parse(ufcx_basix_custom_finite_element.factory) if fname
-    ]
-    assert set(fieldnames) == set(
+    assert _custom_factory_fields == set(
         d.keys()), "Mismatch between keys in template and in formatting dict"
 
     # Format implementation code
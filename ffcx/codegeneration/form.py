@@ -8,11 +8,17 @@
 # old implementation in FFC
 
 import logging
+from string import Formatter
 
 from ffcx.codegeneration import form_template
 
 logger = logging.getLogger("ffcx")
 
+# Template field names, extracted once at import so each generated
+# form only validates its keys against a precomputed set
+_factory_fields = {fname for _, fname, _, _
+                   in Formatter().parse(form_template.factory) if fname}
+
 
 def generator(ir, options):
     """Generate UFC code for a form."""
@@ -39,7 +45,7 @@ def generator(ir, options):
 
     if len(ir.original_coefficient_position) > 0:
         d["original_coefficient_position_init"] = L.ArrayDecl(
-            "int", f"original_coefficient_position_{ir.name}",
+            "static int", f"original_coefficient_position_{ir.name}",
             values=ir.original_coefficient_position, sizes=len(ir.original_coefficient_position))
         d["original_coefficient_position"] = f"original_coefficient_position_{ir.name}"
     else:
@@ -67,7 +73,7 @@ def generator(ir, options):
 
     if len(ir.finite_elements) > 0:
         d["finite_elements"] = f"finite_elements_{ir.name}"
-        d["finite_elements_init"] = L.ArrayDecl("ufcx_finite_element*", f"finite_elements_{ir.name}", values=[
+        d["finite_elements_init"] = L.ArrayDecl("static ufcx_finite_element*", f"finite_elements_{ir.name}", values=[
                                                 L.AddressOf(L.Symbol(el)) for el in ir.finite_elements],
                                                 sizes=len(ir.finite_elements))
     else:
@@ -76,7 +82,7 @@ def generator(ir, options):
 
     if len(ir.dofmaps) > 0:
         d["dofmaps"] = f"dofmaps_{ir.name}"
-        d["dofmaps_init"] = L.ArrayDecl("ufcx_dofmap*", f"dofmaps_{ir.name}", values=[
+        d["dofmaps_init"] = L.ArrayDecl("static ufcx_dofmap*", f"dofmaps_{ir.name}", values=[
             L.AddressOf(L.Symbol(dofmap)) for dofmap in ir.dofmaps], sizes=len(ir.dofmaps))
     else:
         d["dofmaps"] = L.Null()
@@ -132,9 +138,7 @@ def generator(ir, options):
     d["functionspace"] = L.StatementList(code)
 
     # Check that no keys are redundant or have been missed
-    from string import Formatter
-    fields = [fname for _, fname, _, _ in Formatter().parse(form_template.factory) if fname]
-    assert set(fields) == set(d.keys()), "Mismatch between keys in template and in formatting dict"
+    assert _factory_fields == set(d.keys()), "Mismatch between keys in template and in formatting dict"
 
     # Format implementation code
     implementation = form_template.factory.format_map(d)
@@ -10,26 +10,14 @@ import basix
 
 
 def write_table(L, tablename, cellname, type: str):
-    if tablename == "facet_edge_vertices":
-        return facet_edge_vertices(L, tablename, cellname)
-    if tablename == "reference_facet_jacobian":
-        return reference_facet_jacobian(L, tablename, cellname, type)
-    if tablename == "reference_cell_volume":
-        return reference_cell_volume(L, tablename, cellname, type)
-    if tablename == "reference_facet_volume":
-        return reference_facet_volume(L, tablename, cellname, type)
-    if tablename == "reference_edge_vectors":
-        return reference_edge_vectors(L, tablename, cellname, type)
-    if tablename == "facet_reference_edge_vectors":
-        return facet_reference_edge_vectors(L, tablename, cellname, type)
-    if tablename == "reference_facet_normals":
-        return reference_facet_normals(L, tablename, cellname, type)
-    if tablename == "facet_orientation":
-        return facet_orientation(L, tablename, cellname, type)
-    raise ValueError(f"Unknown geometry table name: {tablename}")
-
-
-def facet_edge_vertices(L, tablename, cellname):
+    writer = _table_writers.get(tablename)
+    if writer is None:
+        raise ValueError(f"Unknown geometry table name: {tablename}")
+    return writer(L, tablename, cellname, type)
+
+
+def facet_edge_vertices(L, tablename, cellname, type: str):
+    # The type argument is unused; this table always holds vertex indices
     celltype = getattr(basix.CellType, cellname)
     topology = basix.topology(celltype)
     triangle_edges = basix.topology(basix.CellType.triangle)[1]
@@ -114,3 +102,15 @@ def facet_orientation(L, tablename, cellname, type: str):
     celltype = getattr(basix.CellType, cellname)
     out = basix.cell.facet_orientations(celltype)
     return L.ArrayDecl(f"static const {type}", f"{cellname}_{tablename}", out.shape, out)
+
+
+# Lookup table for the writer to call in write_table, depending on the
+# geometry table name
+_table_writers = {"facet_edge_vertices": facet_edge_vertices,
+                  "reference_facet_jacobian": reference_facet_jacobian,
+                  "reference_cell_volume": reference_cell_volume,
+                  "reference_facet_volume": reference_facet_volume,
+                  "reference_edge_vectors": reference_edge_vectors,
+                  "facet_reference_edge_vectors": facet_reference_edge_vectors,
+                  "reference_facet_normals": reference_facet_normals,
+                  "facet_orientation": facet_orientation}
@@ -481,9 +481,8 @@ class IntegralGenerator(object):
             scalar_blockmap = []
             assert len(blockdata.ma_data) == len(blockmap)
             for i, b in enumerate(blockmap):
-                bs = blockdata.ma_data[i].tabledata.block_size
-                offset = blockdata.ma_data[i].tabledata.offset
-                b = tuple([(idx - offset) // bs for idx in b])
+                td = blockdata.ma_data[i].tabledata
+                b = tuple([(idx - td.offset) // td.block_size for idx in b])
                 scalar_blockmap.append(b)
             block_groups[tuple(scalar_blockmap)].append(blockdata)
 
@@ -605,13 +604,12 @@ class IntegralGenerator(object):
 
             A_indices = []
             for i in range(block_rank):
-                offset = blockdata.ma_data[i].tabledata.offset
+                td = blockdata.ma_data[i].tabledata
                 index = arg_indices[i]
                 if len(blockmap[i]) == 1:
-                    A_indices.append(index + offset)
+                    A_indices.append(index + td.offset)
                 else:
-                    block_size = blockdata.ma_data[i].tabledata.block_size
-                    A_indices.append(block_size * index + offset)
+                    A_indices.append(td.block_size * index + td.offset)
             rhs_expressions[tuple(A_indices)].append(B_rhs)
 
         # List of statements to keep in the inner loop
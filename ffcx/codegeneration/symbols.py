@@ -64,12 +64,22 @@ class FFCXBackendSymbols(object):
     def __init__(self, language, coefficient_numbering, coefficient_offsets,
                  original_constant_offsets):
         self.L = language
-        self.S = self.L.Symbol
+        # Symbols are immutable value types, so instances for the
+        # recurring names (loop indices, argument arrays, tables) can
+        # be shared instead of reallocated at every access
+        self._symbol_cache = {}
         self.coefficient_numbering = coefficient_numbering
         self.coefficient_offsets = coefficient_offsets
 
         self.original_constant_offsets = original_constant_offsets
 
+    def S(self, name):
+        """Get a (shared) symbol with the given name."""
+        s = self._symbol_cache.get(name)
+        if s is None:
+            s = self._symbol_cache[name] = self.L.Symbol(name)
+        return s
+
     def element_tensor(self):
         """Symbol for the element tensor itself."""
         return self.S("A")
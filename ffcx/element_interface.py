@@ -9,7 +9,7 @@ from __future__ import annotations
 
 import typing
 import warnings
-from functools import lru_cache
+from functools import cached_property, lru_cache
 
 import numpy
 
@@ -90,11 +90,18 @@ def reference_cell_vertices(cellname: str) -> numpy.typing.NDArray[numpy.float64
     return basix.geometry(basix.cell.string_to_type(cellname))
 
 
+@lru_cache()
+def _facet_vertices(cellname: str, facet: int) -> typing.Tuple[numpy.typing.NDArray[numpy.float64], ...]:
+    """Get the vertices of a facet of a reference cell."""
+    cell_type = basix.cell.string_to_type(cellname)
+    geom = basix.geometry(cell_type)
+    return tuple(geom[i] for i in basix.topology(cell_type)[-2][facet])
+
+
 def map_facet_points(points: numpy.typing.NDArray[numpy.float64], facet: int,
                      cellname: str) -> numpy.typing.NDArray[numpy.float64]:
     """Map points from a reference facet to a physical facet."""
-    geom = basix.geometry(basix.cell.string_to_type(cellname))
-    facet_vertices = [geom[i] for i in basix.topology(basix.cell.string_to_type(cellname))[-2][facet]]
+    facet_vertices = _facet_vertices(cellname, facet)
     return numpy.asarray([facet_vertices[0] + sum((i - facet_vertices[0]) * j for i, j in zip(facet_vertices[1:], p))
                           for p in points], dtype=numpy.float64)
 
@@ -163,8 +170,7 @@ class QuadratureElement(basix.ufl_wrapper._BasixElementBase):
 
         if points.shape != self._points.shape:
             raise ValueError("Mismatch of tabulation points and element points.")
-        tables = numpy.asarray([numpy.eye(points.shape[0], points.shape[0])])
-        return tables
+        return numpy.eye(points.shape[0])[numpy.newaxis, :, :]
 
     def get_component_element(self, flat_component: int) -> typing.Tuple[basix.ufl_wrapper._BasixElementBase, int, int]:
         """Get element that represents a component of the element, and the offset and stride of the component.
@@ -187,7 +193,7 @@ class QuadratureElement(basix.ufl_wrapper._BasixElementBase):
         """Number of DOFs the element has."""
         return self._points.shape[0]
 
-    @property
+    @cached_property
     def num_entity_dofs(self) -> typing.List[typing.List[int]]:
         """Number of DOFs associated with each entity."""
         dofs = []
@@ -197,7 +203,7 @@ class QuadratureElement(basix.ufl_wrapper._BasixElementBase):
         dofs += [[self.dim]]
         return dofs
 
-    @property
+    @cached_property
     def entity_dofs(self) -> typing.List[typing.List[typing.List[int]]]:
         """DOF numbers associated with each entity."""
         start_dof = 0
@@ -343,7 +349,7 @@ class RealElement(basix.ufl_wrapper._BasixElementBase):
         """Number of DOFs the element has."""
         return 0
 
-    @property
+    @cached_property
     def num_entity_dofs(self) -> typing.List[typing.List[int]]:
         """Number of DOFs associated with each entity."""
         dofs = []
@@ -353,7 +359,7 @@ class RealElement(basix.ufl_wrapper._BasixElementBase):
         dofs += [[self.dim]]
         return dofs
 
-    @property
+    @cached_property
     def entity_dofs(self) -> typing.List[typing.List[typing.List[int]]]:
         """DOF numbers associated with each entity."""
         start_dof = 0
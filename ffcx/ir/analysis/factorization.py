@@ -244,6 +244,9 @@ def compute_argument_factorization(S, rank):
     arg_indices = build_argument_indices(S)
     AV = [S.nodes[i]['expression'] for i in arg_indices]
 
+    # Map argument vertex indices in S to their position in AV
+    arg_position = {si: ai for ai, si in enumerate(arg_indices)}
+
     # Data structure for building non-argument factors
     F = ExpressionGraph()
     # Attach a quick lookup dict for expression to index
@@ -272,7 +275,7 @@ def compute_argument_factorization(S, rank):
         deps = S.out_edges[si]
         v = attr['expression']
 
-        if si in arg_indices:
+        if si in arg_position:
             assert len(deps) == 0
             # v is a modified Argument
             factors = {(si, ): one_index}
@@ -318,21 +321,15 @@ def compute_argument_factorization(S, rank):
             # Map argkeys from indices into SV to indices into AV,
             # and resort keys for canonical representation
             for argkey, fi in S.nodes[S_target]['factors'].items():
-                ai_fi = {tuple(sorted(arg_indices.index(si) for si in argkey)): fi}
+                ai_fi = {tuple(sorted(arg_position[si] for si in argkey)): fi}
                 for comp in S.nodes[S_target]["component"]:
-                    if factors.get(comp):
-                        factors[comp].update(ai_fi)
-                    else:
-                        factors[comp] = ai_fi
+                    factors.setdefault(comp, {}).update(ai_fi)
 
     # Indices into F that are needed for final result
     for comp, target in factors.items():
         for argkey, fi in target.items():
-            F.nodes[fi]["target"] = F.nodes[fi].get("target", [])
-            F.nodes[fi]["target"].append(argkey)
-
-            F.nodes[fi]["component"] = F.nodes[fi].get("component", [])
-            F.nodes[fi]["component"].append(comp)
+            F.nodes[fi].setdefault("target", []).append(argkey)
+            F.nodes[fi].setdefault("component", []).append(comp)
 
     # Compute dependencies in FV
     for i, v in F.nodes.items():
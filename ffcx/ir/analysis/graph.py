@@ -7,8 +7,6 @@
 
 import logging
 
-import numpy
-
 import ufl
 from ffcx.ir.analysis.modified_terminals import is_modified_terminal
 from ffcx.ir.analysis.reconstruct import reconstruct
@@ -45,8 +43,8 @@ class ExpressionGraph(object):
         if node1 not in self.nodes or node2 not in self.nodes:
             raise KeyError("Adding edge to unknown node")
 
-        self.out_edges[node1] += [node2]
-        self.in_edges[node2] += [node1]
+        self.out_edges[node1].append(node2)
+        self.in_edges[node2].append(node1)
 
 
 def build_graph_vertices(expressions, skip_terminal_modifiers=False):
@@ -65,8 +63,7 @@ def build_graph_vertices(expressions, skip_terminal_modifiers=False):
         # Get vertex index representing input expression root
         V_target = G.e2i[expr]
         G.nodes[V_target]['target'] = True
-        G.nodes[V_target]['component'] = G.nodes[V_target].get("component", [])
-        G.nodes[V_target]['component'].append(comp)
+        G.nodes[V_target].setdefault('component', []).append(comp)
 
     return G
 
@@ -125,8 +122,8 @@ def rebuild_with_scalar_subexpressions(G):
     V_symbols = value_numberer.compute_symbols()
     total_unique_symbols = value_numberer.symbol_count
 
-    # Array to store the scalar subexpression in for each symbol
-    W = numpy.empty(total_unique_symbols, dtype=object)
+    # List to store the scalar subexpression in for each symbol
+    W = [None] * total_unique_symbols
 
     # Iterate over each graph node in order
     for i, v in G.nodes.items():
@@ -194,7 +191,7 @@ def rebuild_with_scalar_subexpressions(G):
 
     # Find symbols of final v from input graph
     vs = V_symbols[-1]
-    scalar_expressions = W[vs]
+    scalar_expressions = [W[s] for s in vs]
     return scalar_expressions
 
 
@@ -5,9 +5,10 @@
 # SPDX-License-Identifier:    LGPL-3.0-or-later
 """Algorithms for working with multiindices."""
 
+import itertools
+
 import ufl
 from ufl.classes import ComponentTensor, FixedIndex, Index, Indexed
-from ufl.permutation import compute_indices
 from ufl.utils.indexflattening import flatten_multiindex, shape_to_strides
 
 
@@ -58,8 +59,9 @@ def map_indexed_arg_components(indexed):
         if isinstance(i, Index):
             multiindex_to_ind1_map[k] = fi1.index(i.count())
 
-    # Build map from flattened e1 component to flattened e2 component
-    perm1 = compute_indices(tsh1)
+    # Build map from flattened e1 component to flattened e2 component,
+    # streaming the index tuples in C order instead of materializing them
+    perm1 = itertools.product(*map(range, tsh1))
     ni1 = ufl.product(tsh1)
 
     # Situation: e1 = e2[mi]
@@ -133,8 +135,9 @@ def map_component_tensor_arg_components(tensor):
     for k, i in enumerate(mi):
         p2_to_p1_map[k] = fi1.index(mi[k].count())
 
-    # Build map from flattened e1 component to flattened e2 component
-    perm2 = compute_indices(tsh2)
+    # Build map from flattened e1 component to flattened e2 component,
+    # streaming the index tuples in C order instead of materializing them
+    perm2 = itertools.product(*map(range, tsh2))
     ni2 = ufl.product(tsh2)
 
     # Situation: e2 = as_tensor(e1, mi)
@@ -5,10 +5,12 @@
 # SPDX-License-Identifier:    LGPL-3.0-or-later
 
 import logging
+import weakref
 
 from ufl.classes import (Argument, CellAvg, FacetAvg, FixedIndex, FormArgument,
-                         Grad, Indexed, Jacobian, ReferenceGrad,
-                         ReferenceValue, Restricted, SpatialCoordinate)
+                         Grad, Indexed, Jacobian, NegativeRestricted,
+                         PositiveRestricted, ReferenceGrad, ReferenceValue,
+                         SpatialCoordinate, all_ufl_classes)
 from ufl.permutation import build_component_numbering
 
 from ...element_interface import convert_element
@@ -42,6 +44,10 @@ class ModifiedTerminal(object):
         - flat_component
     """
 
+    __slots__ = ("expr", "terminal", "reference_value", "base_shape", "base_symmetry",
+                 "component", "flat_component", "global_derivatives", "local_derivatives",
+                 "averaged", "restriction", "_key", "_hash", "__weakref__")
+
     def __init__(self, expr, terminal, reference_value, base_shape, base_symmetry, component,
                  flat_component, global_derivatives, local_derivatives, averaged, restriction):
         # The original expression
@@ -73,23 +79,21 @@ class ModifiedTerminal(object):
         # Restriction to one cell or the other for interior facet integrals
         self.restriction = restriction
 
+        # Cache the identifying tuple and its hash; these objects are
+        # used heavily as dict/set keys during factorization, so
+        # rebuilding the tuple on every __hash__/__eq__ adds up
+        # FIXME: Terminal is not sortable...
+        self._key = (terminal, reference_value, flat_component, global_derivatives,
+                     local_derivatives, averaged, restriction)
+        self._hash = hash(self._key)
+
     def as_tuple(self):
         """Return a tuple with hashable values that uniquely identifies this modified terminal.
 
         Some of the derived variables can be omitted here as long as
         they are fully determined from the variables that are included here.
         """
-        t = self.terminal  # FIXME: Terminal is not sortable...
-        rv = self.reference_value
-        # bs = self.base_shape
-        # bsy = self.base_symmetry
-        # c = self.component
-        fc = self.flat_component
-        gd = self.global_derivatives
-        ld = self.local_derivatives
-        a = self.averaged
-        r = self.restriction
-        return (t, rv, fc, gd, ld, a, r)
+        return self._key
 
     def argument_ordering_key(self):
         """Return a key for deterministic sorting of argument vertex indices.
@@ -114,10 +118,10 @@ class ModifiedTerminal(object):
         return (n, p, rv, fc, gd, ld, a, r)
 
     def __hash__(self):
-        return hash(self.as_tuple())
+        return self._hash
 
     def __eq__(self, other):
-        return isinstance(other, ModifiedTerminal) and self.as_tuple() == other.as_tuple()
+        return isinstance(other, ModifiedTerminal) and self._key == other._key
 
     # def __lt__(self, other):
     #    error("Shouldn't use this?")
@@ -135,113 +139,208 @@ class ModifiedTerminal(object):
             f"restriction:        {self.restriction}")
 
 
+# Precomputed type sets so the hot traversal loops below cost one set
+# probe per node instead of repeated attribute lookups on each instance
+_terminal_types = frozenset(
+    c for c in all_ufl_classes if getattr(c, "_ufl_is_terminal_", False))
+_terminal_modifier_types = frozenset(
+    c for c in all_ufl_classes if getattr(c, "_ufl_is_terminal_modifier_", False))
+
+
 def is_modified_terminal(v):
     """Check if v is a terminal or a terminal wrapped in terminal modifier types."""
-    while not v._ufl_is_terminal_:
-        if v._ufl_is_terminal_modifier_:
-            v = v.ufl_operands[0]
-        else:
+    tp = type(v)
+    while tp not in _terminal_types:
+        if tp not in _terminal_modifier_types:
             return False
+        v = v.ufl_operands[0]
+        tp = type(v)
     return True
 
 
 def strip_modified_terminal(v):
     """Extract core Terminal from a modified terminal or return None."""
-    while not v._ufl_is_terminal_:
-        if v._ufl_is_terminal_modifier_:
-            v = v.ufl_operands[0]
-        else:
+    tp = type(v)
+    while tp not in _terminal_types:
+        if tp not in _terminal_modifier_types:
             return None
+        v = v.ufl_operands[0]
+        tp = type(v)
     return v
 
 
-def analyse_modified_terminal(expr):
-    """Analyse a so-called 'modified terminal' expression.
+def _analyse_indexed(t, state):
+    if state["component"] is not None:
+        raise RuntimeError("Got twice indexed terminal.")
 
-    Return its properties in more compact form as a ModifiedTerminal object.
+    t, i = t.ufl_operands
+    # Validate and extract the index values in one pass; FixedIndex
+    # already stores a plain int, so no coercion is needed
+    component = []
+    for j in i:
+        if not isinstance(j, FixedIndex):
+            raise RuntimeError("Expected only fixed indices.")
+        component.append(j._value)
+    state["component"] = tuple(component)
+    return t
 
-    A modified terminal expression is an object of a Terminal subtype,
-    wrapped in terminal modifier types.
 
-    The wrapper types can include 0-* Grad or ReferenceGrad objects,
-    and 0-1 ReferenceValue, 0-1 Restricted, 0-1 Indexed,
-    and 0-1 FacetAvg or CellAvg objects.
-    """
-    # Data to determine
-    component = None
-    global_derivatives = []
-    local_derivatives = []
-    reference_value = None
-    restriction = None
-    averaged = None
-
-    # Start with expr and strip away layers of modifiers
-    t = expr
-    while not t._ufl_is_terminal_:
-        if isinstance(t, Indexed):
-            if component is not None:
-                raise RuntimeError("Got twice indexed terminal.")
+def _analyse_reference_value(t, state):
+    if state["reference_value"] is not None:
+        raise RuntimeError("Got twice pulled back terminal!")
 
-            t, i = t.ufl_operands
-            component = [int(j) for j in i]
+    t, = t.ufl_operands
+    state["reference_value"] = True
+    return t
 
-            if not all(isinstance(j, FixedIndex) for j in i):
-                raise RuntimeError("Expected only fixed indices.")
 
-        elif isinstance(t, ReferenceValue):
-            if reference_value is not None:
-                raise RuntimeError("Got twice pulled back terminal!")
+def _analyse_reference_grad(t, state):
+    component = state["component"]
+    if not component:  # covers None or ()
+        raise RuntimeError("Got local gradient of terminal without prior indexing.")
 
-            t, = t.ufl_operands
-            reference_value = True
+    t, = t.ufl_operands
+    state["local_derivatives"].append(component[-1])
+    state["component"] = component[:-1]
+    return t
 
-        elif isinstance(t, ReferenceGrad):
-            if not component:  # covers None or ()
-                raise RuntimeError("Got local gradient of terminal without prior indexing.")
 
-            t, = t.ufl_operands
-            local_derivatives.append(component[-1])
-            component = component[:-1]
+def _analyse_grad(t, state):
+    component = state["component"]
+    if not component:  # covers None or ()
+        raise RuntimeError("Got local gradient of terminal without prior indexing.")
 
-        elif isinstance(t, Grad):
-            if not component:  # covers None or ()
-                raise RuntimeError("Got local gradient of terminal without prior indexing.")
+    t, = t.ufl_operands
+    state["global_derivatives"].append(component[-1])
+    state["component"] = component[:-1]
+    return t
 
-            t, = t.ufl_operands
-            global_derivatives.append(component[-1])
-            component = component[:-1]
 
-        elif isinstance(t, Restricted):
-            if restriction is not None:
-                raise RuntimeError("Got twice restricted terminal!")
+def _analyse_restricted(t, state):
+    if state["restriction"] is not None:
+        raise RuntimeError("Got twice restricted terminal!")
 
-            restriction = t._side
-            t, = t.ufl_operands
+    state["restriction"] = t._side
+    t, = t.ufl_operands
+    return t
 
-        elif isinstance(t, CellAvg):
-            if averaged is not None:
-                raise RuntimeError("Got twice averaged terminal!")
 
-            t, = t.ufl_operands
-            averaged = "cell"
+def _analyse_cell_avg(t, state):
+    if state["averaged"] is not None:
+        raise RuntimeError("Got twice averaged terminal!")
 
-        elif isinstance(t, FacetAvg):
-            if averaged is not None:
-                raise RuntimeError("Got twice averaged terminal!")
+    t, = t.ufl_operands
+    state["averaged"] = "cell"
+    return t
 
-            t, = t.ufl_operands
-            averaged = "facet"
 
-        elif t._ufl_terminal_modifiers_:
-            raise RuntimeError("Missing handler for terminal modifier type {}, object is {}.".format(
-                type(t), repr(t)))
+def _analyse_facet_avg(t, state):
+    if state["averaged"] is not None:
+        raise RuntimeError("Got twice averaged terminal!")
 
-        else:
-            raise RuntimeError("Unexpected type %s object %s." % (type(t), repr(t)))
+    t, = t.ufl_operands
+    state["averaged"] = "facet"
+    return t
 
-    # Make canonical representation of derivatives
-    global_derivatives = tuple(sorted(global_derivatives))
-    local_derivatives = tuple(sorted(local_derivatives))
+
+# Lookup table for handler to call when stripping a modifier layer in
+# analyse_modified_terminal, depending on the modifier type
+_modifier_handlers = {Indexed: _analyse_indexed,
+                      ReferenceValue: _analyse_reference_value,
+                      ReferenceGrad: _analyse_reference_grad,
+                      Grad: _analyse_grad,
+                      PositiveRestricted: _analyse_restricted,
+                      NegativeRestricted: _analyse_restricted,
+                      CellAvg: _analyse_cell_avg,
+                      FacetAvg: _analyse_facet_avg}
+
+# Component numberings depend only on shape and symmetry, of which a
+# form has a handful of combinations while producing thousands of
+# modified terminals; share the permutation work between them
+_component_numbering_cache = {}
+
+
+def _component_numbering(base_shape, base_symmetry):
+    key = (base_shape, tuple(sorted(base_symmetry.items())))
+    cached = _component_numbering_cache.get(key)
+    if cached is None:
+        cached = _component_numbering_cache[key] = build_component_numbering(
+            base_shape, base_symmetry)
+    return cached
+
+
+# Analysis results keyed on the analysed expression (UFL hashes and
+# compares structurally, so equal expressions share one result), plus
+# an interning table keyed on the identifying tuple so that different
+# expressions reducing to the same modified terminal share a single
+# instance and downstream dict/set probes hit pointer equality. Weak
+# values keep both tables from pinning results between compilations.
+_analysis_cache = weakref.WeakValueDictionary()
+_intern_cache = weakref.WeakValueDictionary()
+
+
+def analyse_modified_terminal(expr):
+    """Analyse a so-called 'modified terminal' expression.
+
+    Return its properties in more compact form as a ModifiedTerminal object.
+
+    A modified terminal expression is an object of a Terminal subtype,
+    wrapped in terminal modifier types.
+
+    The wrapper types can include 0-* Grad or ReferenceGrad objects,
+    and 0-1 ReferenceValue, 0-1 Restricted, 0-1 Indexed,
+    and 0-1 FacetAvg or CellAvg objects.
+    """
+    # The same modified terminal is encountered over and over while
+    # building and factorizing the scalar graph; reuse earlier analysis
+    mt = _analysis_cache.get(expr)
+    if mt is not None:
+        return mt
+
+    # Data to determine
+    state = {"component": None,
+             "global_derivatives": [],
+             "local_derivatives": [],
+             "reference_value": None,
+             "restriction": None,
+             "averaged": None}
+
+    # Start with expr and strip away layers of modifiers, dispatching on
+    # the concrete type instead of a linear isinstance cascade
+    t = expr
+    while not t._ufl_is_terminal_:
+        tt = type(t)
+        handler = _modifier_handlers.get(tt)
+        if handler is None:
+            # Look for parent class types instead, caching the resolved
+            # handler so later calls with this type hit the dict lookup
+            for k in list(_modifier_handlers.keys()):
+                if isinstance(t, k):
+                    handler = _modifier_handlers[tt] = _modifier_handlers[k]
+                    break
+
+        if handler is None:
+            if t._ufl_terminal_modifiers_:
+                raise RuntimeError("Missing handler for terminal modifier type {}, object is {}.".format(
+                    tt, repr(t)))
+            else:
+                raise RuntimeError("Unexpected type %s object %s." % (tt, repr(t)))
+
+        t = handler(t, state)
+
+    component = state["component"]
+    global_derivatives = state["global_derivatives"]
+    local_derivatives = state["local_derivatives"]
+    reference_value = state["reference_value"]
+    restriction = state["restriction"]
+    averaged = state["averaged"]
+
+    # Make canonical representation of derivatives; sort the small
+    # lists in place instead of allocating sorted copies
+    global_derivatives.sort()
+    local_derivatives.sort()
+    global_derivatives = tuple(global_derivatives)
+    local_derivatives = tuple(local_derivatives)
 
     # Make reference_value true or false
     reference_value = reference_value or False
@@ -255,11 +354,10 @@ def analyse_modified_terminal(expr):
         if global_derivatives and reference_value:
             raise RuntimeError("Global derivatives of local value is not legal.")
 
-    # Make sure component is an integer tuple
+    # The walk keeps component as a tuple (slicing in the derivative
+    # handlers preserves that), only the unindexed case is left
     if component is None:
         component = ()
-    else:
-        component = tuple(component)
 
     # Get the shape of the core terminal or its reference value, this is
     # the shape that component refers to
@@ -281,13 +379,27 @@ def analyse_modified_terminal(expr):
     # terminal
     if len(component) != len(base_shape):
         raise RuntimeError("Length of component does not match rank of (reference) terminal.")
-    if not all(c >= 0 and c < d for c, d in zip(component, base_shape)):
-        raise RuntimeError("Component indices %s are outside value shape %s" % (component, base_shape))
-
-    # Flatten component
-    vi2si, _ = build_component_numbering(base_shape, base_symmetry)
-    flat_component = vi2si[component]
 
-    return ModifiedTerminal(expr, t, reference_value, base_shape, base_symmetry, component,
-                            flat_component, global_derivatives, local_derivatives, averaged,
-                            restriction)
+    # Flatten component; most terminals are scalar or plain vector
+    # valued, so skip the numbering machinery for those. Range
+    # validation comes for free from the bound check respectively the
+    # numbering lookup, so no separate pass over the component is made
+    if not base_shape:
+        flat_component = 0
+    elif len(base_shape) == 1 and not base_symmetry:
+        flat_component = component[0]
+        if not 0 <= flat_component < base_shape[0]:
+            raise RuntimeError("Component indices %s are outside value shape %s" % (component, base_shape))
+    else:
+        vi2si, _ = _component_numbering(base_shape, base_symmetry)
+        try:
+            flat_component = vi2si[component]
+        except KeyError:
+            raise RuntimeError("Component indices %s are outside value shape %s" % (component, base_shape))
+
+    mt = ModifiedTerminal(expr, t, reference_value, base_shape, base_symmetry, component,
+                          flat_component, global_derivatives, local_derivatives, averaged,
+                          restriction)
+    mt = _intern_cache.setdefault(mt._key, mt)
+    _analysis_cache[expr] = mt
+    return mt
@@ -55,8 +55,7 @@ class ValueNumberer(object):
         return begin
 
     def get_node_symbols(self, expr):
-        idx = [i for i, v in self.G.nodes.items() if v['expression'] == expr][0]
-        return self.V_symbols[idx]
+        return self.V_symbols[self.G.e2i[expr]]
 
     def compute_symbols(self):
         for i, v in self.G.nodes.items():
@@ -67,10 +66,14 @@ class ValueNumberer(object):
             if f:
                 symbol = f(expr)
             else:
-                # Look for parent class types instead
+                # Look for parent class types instead, caching the
+                # resolved handler so that later nodes of the same
+                # concrete type take the exact-match path above
                 for k in self.call_lookup.keys():
                     if isinstance(expr, k):
-                        symbol = self.call_lookup[k](expr)
+                        f = self.call_lookup[k]
+                        self.call_lookup[type(expr)] = f
+                        symbol = f(expr)
                         break
 
             if symbol is None:
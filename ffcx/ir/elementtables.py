@@ -25,6 +25,7 @@ default_atol = 1e-9
 
 piecewise_ttypes = ("piecewise", "fixed", "ones", "zeros")
 uniform_ttypes = ("fixed", "ones", "zeros", "uniform")
+varying_ttypes = ("varying", "quadrature", "uniform")
 
 
 class ModifiedTerminalElement(typing.NamedTuple):
@@ -48,10 +49,11 @@ class UniqueTableReferenceT(typing.NamedTuple):
 def equal_tables(a, b, rtol=default_rtol, atol=default_atol):
     a = numpy.asarray(a)
     b = numpy.asarray(b)
+    if a is b:
+        return True
     if a.shape != b.shape:
         return False
-    else:
-        return numpy.allclose(a, b, rtol=rtol, atol=atol)
+    return numpy.allclose(a, b, rtol=rtol, atol=atol)
 
 
 def clamp_table_small_numbers(table,
@@ -62,7 +64,7 @@ def clamp_table_small_numbers(table,
     # Get shape of table and number of columns, defined as the last axis
     table = numpy.asarray(table)
     for n in numbers:
-        table[numpy.where(numpy.isclose(table, n, rtol=rtol, atol=atol))] = n
+        table[numpy.isclose(table, n, rtol=rtol, atol=atol)] = n
     return table
 
 
@@ -126,22 +128,15 @@ def get_ffcx_table_values(points, cell, integral_type, element, avg, entitytype,
         component_tables.append(tbl)
 
     if avg in ("cell", "facet"):
-        # Compute numeric integral of the each component table
-        wsum = sum(weights)
-        for entity, tbl in enumerate(component_tables):
-            num_dofs = tbl.shape[1]
-            tbl = numpy.dot(tbl, weights) / wsum
-            tbl = numpy.reshape(tbl, (1, num_dofs))
-            component_tables[entity] = tbl
-
-    # Loop over entities and fill table blockwise (each block = points x dofs)
-    # Reorder axes as (points, dofs) instead of (dofs, points)
+        # Compute numeric integral of the component tables by
+        # contracting the quadrature axis for all entities at once
+        averaged = numpy.dot(numpy.stack(component_tables), weights) / sum(weights)
+        component_tables = list(averaged[:, numpy.newaxis, :])
+
+    # Stack tables for all entities into a single array of shape
+    # (1, num_entities, num_points, num_dofs)
     assert len(component_tables) == num_entities
-    num_points, num_dofs = component_tables[0].shape
-    shape = (1, num_entities, num_points, num_dofs)
-    res = numpy.zeros(shape)
-    for entity in range(num_entities):
-        res[:, entity, :, :] = component_tables[entity]
+    res = numpy.stack(component_tables)[numpy.newaxis, :, :, :]
 
     return {'array': res, 'offset': offset, 'stride': stride}
 
@@ -300,6 +295,17 @@ def build_optimized_tables(quadrature_rule, cell, integral_type, entitytype,
 
     _existing_tables = existing_tables.copy()
 
+    # Group candidate tables by shape, so deduplication only compares
+    # tables that can actually be equal
+    tables_by_shape: typing.Dict[typing.Tuple[int, ...], typing.List[str]] = {}
+    for existing_name, existing_values in _existing_tables.items():
+        tables_by_shape.setdefault(existing_values.shape, []).append(existing_name)
+
+    # Cache of raw tabulated values, keyed by table name. Several
+    # modified terminals (e.g. the two restrictions of an argument) map
+    # to the same name and would otherwise tabulate identical tables.
+    table_values_cache: typing.Dict[str, dict] = {}
+
     for mt in modified_terminals:
         res = analysis.get(mt)
         if not res:
@@ -320,7 +326,9 @@ def build_optimized_tables(quadrature_rule, cell, integral_type, entitytype,
 
         tdim = cell.topological_dimension()
 
-        if integral_type == "interior_facet":
+        if name in table_values_cache:
+            t = table_values_cache[name]
+        elif integral_type == "interior_facet":
             if tdim == 1:
                 t = get_ffcx_table_values(quadrature_rule.points, cell,
                                           integral_type, element, avg, entitytype,
@@ -361,6 +369,8 @@ def build_optimized_tables(quadrature_rule, cell, integral_type, entitytype,
             t = get_ffcx_table_values(quadrature_rule.points, cell,
                                       integral_type, element, avg, entitytype,
                                       local_derivatives, flat_component)
+        table_values_cache[name] = t
+
         # Clean up table
         tbl = clamp_table_small_numbers(t['array'], rtol=rtol, atol=atol)
         tabletype = analyse_table_type(tbl)
@@ -376,9 +386,9 @@ def build_optimized_tables(quadrature_rule, cell, integral_type, entitytype,
             # Reduce table along num_perms axis
             tbl = tbl[:1, :, :, :]
 
-        # Check for existing identical table
+        # Check for existing identical table among those of equal shape
         new_table = True
-        for table_name in _existing_tables:
+        for table_name in tables_by_shape.get(tbl.shape, ()):
             if equal_tables(tbl, _existing_tables[table_name]):
                 name = table_name
                 tbl = _existing_tables[name]
@@ -387,6 +397,7 @@ def build_optimized_tables(quadrature_rule, cell, integral_type, entitytype,
 
         if new_table:
             _existing_tables[name] = tbl
+            tables_by_shape.setdefault(tbl.shape, []).append(name)
 
         cell_offset = 0
         element = convert_element(element)
@@ -407,12 +418,11 @@ def build_optimized_tables(quadrature_rule, cell, integral_type, entitytype,
 
 
 def is_zeros_table(table, rtol=default_rtol, atol=default_atol):
-    return (numpy.product(table.shape) == 0
-            or numpy.allclose(table, numpy.zeros(table.shape), rtol=rtol, atol=atol))
+    return table.size == 0 or numpy.allclose(table, 0.0, rtol=rtol, atol=atol)
 
 
 def is_ones_table(table, rtol=default_rtol, atol=default_atol):
-    return numpy.allclose(table, numpy.ones(table.shape), rtol=rtol, atol=atol)
+    return numpy.allclose(table, 1.0, rtol=rtol, atol=atol)
 
 
 def is_quadrature_table(table, rtol=default_rtol, atol=default_atol):
@@ -6,7 +6,6 @@
 """Main algorithm for building the integral intermediate representation."""
 
 import collections
-import itertools
 import logging
 import typing
 
@@ -18,7 +17,8 @@ from ffcx.ir.analysis.graph import build_scalar_graph
 from ffcx.ir.analysis.modified_terminals import (analyse_modified_terminal,
                                                  is_modified_terminal)
 from ffcx.ir.analysis.visualise import visualise_graph
-from ffcx.ir.elementtables import UniqueTableReferenceT, build_optimized_tables
+from ffcx.ir.elementtables import (UniqueTableReferenceT,
+                                   build_optimized_tables, varying_ttypes)
 from ufl.algorithms.balancing import balance_modifiers
 from ufl.checks import is_cellwise_constant
 from ufl.classes import QuadratureWeight
@@ -77,6 +77,9 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
         # efficiently before argument factorization. We can build
         # terminal_data again after factorization if that's necessary.
 
+        # analyse_modified_terminal caches per expression object, so
+        # terminals shared between S and the factorized graph F are
+        # only analysed once
         initial_terminals = {i: analyse_modified_terminal(v['expression'])
                              for i, v in S.nodes.items()
                              if is_modified_terminal(v['expression'])}
@@ -100,28 +103,36 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
 
         if 'zeros' in table_types.values():
             # If there are any 'zero' tables, replace symbolically and rebuild graph
+            dirty = set()
             for i, mt in initial_terminals.items():
                 # Set modified terminals with zero tables to zero
                 tr = mt_table_reference.get(mt)
                 if tr is not None and tr.ttype == "zeros":
                     S.nodes[i]['expression'] = ufl.as_ufl(0.0)
+                    dirty.add(i)
 
-            # Propagate expression changes using dependency list
+            # Propagate expression changes using dependency list. The
+            # nodes are in topological order (dependencies first), so a
+            # single pass suffices; only nodes depending on a changed
+            # node need to be reconstructed.
             for i, v in S.nodes.items():
-                deps = [S.nodes[j]['expression'] for j in S.out_edges[i]]
-                if deps:
-                    v['expression'] = v['expression']._ufl_expr_reconstruct_(*deps)
-
-            # Recreate expression with correct ufl_shape
-            expressions = [None, ] * num_components
-            for target in S_targets:
-                for comp in S.nodes[target]["component"]:
-                    assert expressions[comp] is None
-                    expressions[comp] = S.nodes[target]["expression"]
-            expression = ufl.as_tensor(numpy.reshape(expressions, expression.ufl_shape))
-
-            # Rebuild scalar list-based graph representation
-            S = build_scalar_graph(expression)
+                deps = S.out_edges[i]
+                if deps and not dirty.isdisjoint(deps):
+                    v['expression'] = v['expression']._ufl_expr_reconstruct_(
+                        *(S.nodes[j]['expression'] for j in deps))
+                    dirty.add(i)
+
+            if dirty:
+                # Recreate expression with correct ufl_shape
+                expressions = [None, ] * num_components
+                for target in S_targets:
+                    for comp in S.nodes[target]["component"]:
+                        assert expressions[comp] is None
+                        expressions[comp] = S.nodes[target]["expression"]
+                expression = ufl.as_tensor(numpy.reshape(expressions, expression.ufl_shape))
+
+                # Rebuild scalar list-based graph representation
+                S = build_scalar_graph(expression)
 
         # Output diagnostic graph as pdf
         if visualise:
@@ -141,14 +152,9 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
             # components
             assert len(F.nodes[fi]['target']) == len(F.nodes[fi]['component'])
 
-            k = 0
-            for w in F.nodes[fi]['target']:
-                comp = F.nodes[fi]['component'][k]
-                argument_factorization[w] = argument_factorization.get(w, [])
-
-                # Store tuple of (factor index, component index)
-                argument_factorization[w].append((fi, comp))
-                k += 1
+            # Store tuples of (factor index, component index)
+            for w, comp in zip(F.nodes[fi]['target'], F.nodes[fi]['component']):
+                argument_factorization.setdefault(w, []).append((fi, comp))
 
         # Get list of indices in F which are the arguments (should be at start)
         argkeys = set()
@@ -156,27 +162,44 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
             argkeys = argkeys | set(w)
         argkeys = list(argkeys)
 
-        # Build set of modified_terminals for each mt factorized vertex in F
-        # and attach tables, if appropriate
+        # Build set of modified_terminals for each mt factorized vertex
+        # in F, attach tables if appropriate, and classify candidate
+        # varying vertices for the dependency analysis in the same pass
+        varying_candidates = []
         for i, v in F.nodes.items():
             expr = v['expression']
-            if is_modified_terminal(expr):
-                mt = analyse_modified_terminal(expr)
-                F.nodes[i]['mt'] = mt
-                tr = mt_table_reference.get(mt)
-                if tr is not None:
-                    F.nodes[i]['tr'] = tr
+            if not is_modified_terminal(expr):
+                continue
+            v['mt'] = analyse_modified_terminal(expr)
+            tr = mt_table_reference.get(v['mt'])
+            if tr is not None:
+                v['tr'] = tr
+                # Check if table computations have revealed values
+                # varying over points
+                if tr.ttype in varying_ttypes:
+                    varying_candidates.append(i)
+                elif tr.ttype not in ("fixed", "piecewise", "ones", "zeros"):
+                    raise RuntimeError("Invalid ttype %s" % (tr.ttype, ))
+            elif not is_cellwise_constant(expr):
+                raise RuntimeError("Error " + str(tr))
+                # Keeping this check to be on the safe side,
+                # not sure which cases this will cover (if any)
 
         # Attach 'status' to each node: 'inactive', 'piecewise' or 'varying'
-        analyse_dependencies(F, mt_table_reference)
+        analyse_dependencies(F, varying_candidates)
 
         # Output diagnostic graph as pdf
         if visualise:
             visualise_graph(F, 'F.pdf')
 
-        # Loop over factorization terms
+        # Tables with more than one permutation variant; loop-invariant
+        # over the factorization terms below
+        permuted_table_names = {name for name, tbl in tables.items() if tbl.shape[0] > 1}
+
+        # Loop over factorization terms in a canonical (sorted) order
+        sorted_factorization = sorted(argument_factorization.items())
         block_contributions = collections.defaultdict(list)
-        for ma_indices, fi_ci in sorted(argument_factorization.items()):
+        for ma_indices, fi_ci in sorted_factorization:
             # Get a bunch of information about this term
             assert rank == len(ma_indices)
             trs = tuple(F.nodes[ai]['tr'] for ai in ma_indices)
@@ -209,10 +232,7 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
 
             # Check if each *each* factor corresponding to this argument is piecewise
             all_factors_piecewise = all(F.nodes[ifi[0]]["status"] == 'piecewise' for ifi in fi_ci)
-            block_is_permuted = False
-            for name in unames:
-                if tables[name].shape[0] > 1:
-                    block_is_permuted = True
+            block_is_permuted = any(name in permuted_table_names for name in unames)
             ma_data = []
             for i, ma in enumerate(ma_indices):
                 ma_data.append(ModifiedArgumentDataT(ma, trs[i]))
@@ -228,18 +248,14 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
             block_contributions[blockmap].append(blockdata)
 
         # Figure out which table names are referenced
-        active_table_names = set()
-        for i, v in F.nodes.items():
-            tr = v.get('tr')
-            if tr is not None and F.nodes[i]['status'] != 'inactive':
-                active_table_names.add(tr.name)
+        active_table_names = {v['tr'].name for v in F.nodes.values()
+                              if v.get('tr') is not None and v['status'] != 'inactive'}
 
         # Figure out which table names are referenced in blocks
-        for blockmap, contributions in itertools.chain(
-                block_contributions.items()):
-            for blockdata in contributions:
-                for mad in blockdata.ma_data:
-                    active_table_names.add(mad.tabledata.name)
+        active_table_names.update(mad.tabledata.name
+                                  for contributions in block_contributions.values()
+                                  for blockdata in contributions
+                                  for mad in blockdata.ma_data)
 
         active_tables = {}
         active_table_types = {}
@@ -265,53 +281,46 @@ def compute_integral_ir(cell, integral_type, entitytype, integrands, argument_sh
     return ir
 
 
-def analyse_dependencies(F, mt_unique_table_reference):
+def analyse_dependencies(F, varying_candidates):
     # Sets 'status' of all nodes to either: 'inactive', 'piecewise' or 'varying'
     # Children of 'target' nodes are either 'piecewise' or 'varying'.
     # All other nodes are 'inactive'.
-    # Varying nodes are identified by their tables ('tr'). All their parent
-    # nodes are also set to 'varying' - any remaining active nodes are 'piecewise'.
+    # Varying nodes are identified by their tables and passed in as
+    # varying_candidates. All their parent nodes are also set to
+    # 'varying' - any remaining active nodes are 'piecewise'.
 
-    # Set targets, and dependencies to 'active'
-    targets = [i for i, v in F.nodes.items() if v.get('target')]
+    # Set targets, and dependencies to 'active'. Nodes are marked when
+    # pushed on the worklist so each node is visited at most once.
+    targets = []
     for i, v in F.nodes.items():
-        v['status'] = 'inactive'
+        if v.get('target'):
+            v['status'] = 'active'
+            targets.append(i)
+        else:
+            v['status'] = 'inactive'
 
     while targets:
         s = targets.pop()
-        F.nodes[s]['status'] = 'active'
         for j in F.out_edges[s]:
             if F.nodes[j]['status'] == 'inactive':
+                F.nodes[j]['status'] = 'active'
                 targets.append(j)
 
     # Build piecewise/varying markers for factorized_vertices
-    varying_ttypes = ("varying", "quadrature", "uniform")
     varying_indices = []
-    for i, v in F.nodes.items():
-        if v.get('mt') is None:
-            continue
-        tr = v.get('tr')
-        if tr is not None:
-            ttype = tr.ttype
-            # Check if table computations have revealed values varying over points
-            if ttype in varying_ttypes:
-                varying_indices.append(i)
-            else:
-                if ttype not in ("fixed", "piecewise", "ones", "zeros"):
-                    raise RuntimeError("Invalid ttype %s" % (ttype, ))
-
-        elif not is_cellwise_constant(v['expression']):
-            raise RuntimeError("Error " + str(tr))
-            # Keeping this check to be on the safe side,
-            # not sure which cases this will cover (if any)
-            # varying_indices.append(i)
-
-    # Set all parents of active varying nodes to 'varying'
+    for i in varying_candidates:
+        v = F.nodes[i]
+        if v['status'] == 'active':
+            v['status'] = 'varying'
+            varying_indices.append(i)
+
+    # Set all parents of active varying nodes to 'varying', again
+    # marking nodes when pushed to avoid revisiting them
     while varying_indices:
         s = varying_indices.pop()
-        if F.nodes[s]['status'] == 'active':
-            F.nodes[s]['status'] = 'varying'
-            for j in F.in_edges[s]:
+        for j in F.in_edges[s]:
+            if F.nodes[j]['status'] == 'active':
+                F.nodes[j]['status'] = 'varying'
                 varying_indices.append(j)
 
     # Any remaining active nodes must be 'piecewise'
@@ -327,5 +336,9 @@ def replace_quadratureweight(expression):
         if is_modified_terminal(node) and isinstance(node, QuadratureWeight):
             r.append(node)
 
+    # Skip the full replace pass when there is nothing to substitute
+    if not r:
+        return expression
+
     replace_map = {q: 1.0 for q in r}
     return ufl.algorithms.replace(expression, replace_map)
@@ -4,6 +4,7 @@
 #
 # SPDX-License-Identifier:    LGPL-3.0-or-later
 
+import functools
 import hashlib
 import typing
 
@@ -85,16 +86,20 @@ def form_name(original_form, form_id, prefix):
     return f"form_{sig}"
 
 
+@functools.lru_cache()
+def _element_signature(ufl_element, prefix):
+    """Signature hash of an element, cached since the same elements recur across forms."""
+    return compute_signature([convert_element(ufl_element)], prefix)
+
+
 def finite_element_name(ufl_element, prefix):
     assert isinstance(ufl_element, ufl.FiniteElementBase)
-    sig = compute_signature([convert_element(ufl_element)], prefix)
-    return f"element_{sig}"
+    return f"element_{_element_signature(ufl_element, prefix)}"
 
 
 def dofmap_name(ufl_element, prefix):
     assert isinstance(ufl_element, ufl.FiniteElementBase)
-    sig = compute_signature([convert_element(ufl_element)], prefix)
-    return f"dofmap_{sig}"
+    return f"dofmap_{_element_signature(ufl_element, prefix)}"
 
 
 def expression_name(expression, prefix):